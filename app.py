@@ -4,10 +4,92 @@ from dotenv import load_dotenv
 
 load_dotenv()
 import tempfile
-from resume_parser_agent_openai import answer_query
-from job_search_script import JobSearcher
+from resume_parser_agent_openai import answer_query_multi_async, build_vector_store, warm_up, warm_up_async
+from job_search_script import MAX_PAGES, JobSearcher
 from company_research_script import CompanyResearcher
-import asyncio
+from async_runner import run_async, spawn
+import atexit
+import hashlib
+import re
+import threading
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+# Section labels, commas and newlines all separate skills in a free-text answer
+SKILL_SEPARATOR_RE = re.compile(r"(?:Technical Skills|Soft Skills|Programming Languages):|[,\n]")
+
+SKILLS_QUERY = "Extract all technical skills, soft skills, and programming languages from the resume. List them as a JSON array of strings."
+EXPERIENCE_QUERY = "Summarize the candidate's work experience in 2-3 sentences."
+# Enough for a long skills list plus the summary; the answer is short and factual
+ANALYSIS_MAX_TOKENS = 450
+ANALYSIS_TEMPERATURE = 0.2
+
+@st.cache_resource
+def get_company_researcher():
+    """Returns one CompanyResearcher per process so its HTTP session is reused."""
+    return CompanyResearcher()
+
+@st.cache_resource
+def get_job_searcher():
+    """Returns one JobSearcher per process so its HTTP session is reused."""
+    return JobSearcher()
+
+@st.cache_resource(show_spinner=False)
+def warm_up_connections():
+    """Opens API connections in the background once per process, before the first click."""
+    searcher = get_job_searcher()
+
+    def warm_up_sync_clients():
+        warm_up()
+        searcher.warm_up()
+
+    threading.Thread(target=warm_up_sync_clients, name="warm-up", daemon=True).start()
+    spawn(warm_up_async())
+    return True
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def cached_research(company_name: str) -> dict:
+    """Researches a company, reusing results for employers seen in the last day."""
+    return run_async(get_company_researcher().research_company(company_name))
+
+@st.cache_resource(show_spinner=False)
+def load_resume_index(pdf_digest: str, _resume_path: str):
+    """Builds the resume vector store once per distinct PDF."""
+    return build_vector_store(_resume_path)
+
+@st.cache_data(show_spinner=False)
+def analyze_resume(pdf_digest: str, _resume_path: str):
+    """Extracts skills and experience, memoized by the hash of the PDF bytes."""
+    vector_store = load_resume_index(pdf_digest, _resume_path)
+    # One retrieval pass and one completion answer both queries
+    result = run_async(answer_query_multi_async(
+        {"skills": SKILLS_QUERY, "experience": EXPERIENCE_QUERY},
+        vector_store=vector_store,
+        max_tokens=ANALYSIS_MAX_TOKENS,
+        temperature=ANALYSIS_TEMPERATURE
+    ))
+    return result["skills"], result["experience"]
+
+def remove_temp_file(path):
+    """Deletes a temporary upload if it still exists."""
+    if path and os.path.exists(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def save_upload(uploaded_file):
+    """Streams an upload to a temporary PDF in fixed-size chunks, hashing it on the way."""
+    digest = hashlib.blake2b()
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+        for chunk in iter(lambda: uploaded_file.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            tmp_file.write(chunk)
+    atexit.register(remove_temp_file, tmp_file.name)
+    return tmp_file.name, digest.hexdigest()
+
+warm_up_connections()
 
 st.title("AI Job Search Assistant")
 
@@ -16,31 +98,33 @@ st.header("1. Upload Your Resume")
 uploaded_file = st.file_uploader("Upload your resume (PDF)", type="pdf")
 
 if uploaded_file is not None:
-    # Save the uploaded file to a temporary location
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        tmp_file.write(uploaded_file.getvalue())
-        resume_path = tmp_file.name
+    # Save the uploaded file to a temporary location once, not on every rerun
+    if st.session_state.get('resume_file_id') != uploaded_file.file_id:
+        remove_temp_file(st.session_state.get('resume_path'))
+        st.session_state.resume_path, st.session_state.pdf_digest = save_upload(uploaded_file)
+        st.session_state.resume_file_id = uploaded_file.file_id
+    resume_path = st.session_state.resume_path
 
     st.success(f"Resume '{uploaded_file.name}' uploaded successfully.")
 
     # Use a button to trigger resume analysis
     if st.button("Analyze Resume"):
         with st.spinner("Analyzing resume..."):
-            # Extract skills and experience from the resume
-            skills_query = "Extract all technical skills, soft skills, and programming languages from the resume. List them as a comma-separated string."
-            experience_query = "Summarize the candidate's work experience in 2-3 sentences."
-            
-            skills = answer_query(skills_query, resume_path)
-            experience = answer_query(experience_query, resume_path)
-            
-            # Clean up the skills string
-            skills = skills.replace("Technical Skills:", "").replace("Soft Skills:", "").replace("Programming Languages:", "").strip()
+            # Extract skills and experience from the resume; failures are not memoized, so a retry re-runs
+            try:
+                skills, experience = analyze_resume(st.session_state.pdf_digest, resume_path)
+            except ValueError as e:
+                st.error(f"Could not analyze the resume: {str(e)} Please try again.")
+            else:
+                if isinstance(skills, str):
+                    # Split the skills string in one pass if the model did not return a list
+                    skills = SKILL_SEPARATOR_RE.split(skills)
 
-            st.session_state.resume_data = {
-                'skills': [skill.strip() for skill in skills.split(',')],
-                'experience': [experience]
-            }
-            st.session_state.resume_analyzed = True
+                st.session_state.resume_data = {
+                    'skills': [str(skill).strip() for skill in skills if str(skill).strip()],
+                    'experience': [experience]
+                }
+                st.session_state.resume_analyzed = True
 
     if st.session_state.get('resume_analyzed'):
         st.subheader("Extracted Information:")
@@ -53,6 +137,7 @@ if st.session_state.get('resume_analyzed'):
     location = st.text_input("Location", "Remote")
     job_types = st.multiselect("Job Type", ["full-time", "part-time", "contract", "internship"])
     work_style = st.selectbox("Work Style", ["Any", "On-site", "Remote", "Hybrid"])
+    num_pages = st.number_input("Pages of results to search", min_value=1, max_value=MAX_PAGES, value=1, step=1)
 
     # --- 3. Search for Jobs ---
     if st.button("Search for Jobs"):
@@ -61,10 +146,11 @@ if st.session_state.get('resume_analyzed'):
             filters = {
                 "location": location,
                 "job_types": job_types,
-                "work_style": work_style
+                "work_style": work_style,
+                "num_pages": int(num_pages)
             }
             
-            searcher = JobSearcher()
+            searcher = get_job_searcher()
             jobs = searcher.search_jobs(st.session_state.resume_data, filters)
             st.session_state.jobs = jobs
 
@@ -82,9 +168,7 @@ if st.session_state.get('jobs'):
                 
                 # if st.button(f"Research {job.get('company_name', 'N/A')}", key=f"research_{i}"):
                 #     with st.spinner(f"Researching {job.get('company_name', 'N/A')}..."):
-                #         researcher = CompanyResearcher()
-                #         # Run the async function
-                #         company_info = asyncio.run(researcher.research_company(job.get('company_name', 'N/A')))
+                #         company_info = cached_research(job.get('company_name', 'N/A'))
                 #         
                 #         st.subheader(f"Company Insights: {job.get('company_name', 'N/A')}")
                 #         st.write("**Company Overview:**", company_info.get('overview', 'Not available'))
@@ -0,0 +1,37 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Optional
+
+try:
+    import uvloop  # optional: lower per-task overhead (Linux/macOS only)
+except ImportError:
+    uvloop = None
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Returns the process-wide background event loop, starting it on first use."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-runner", daemon=True).start()
+    return _loop
+
+
+def run_async(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """
+    Runs a coroutine on the background loop and waits for its result.
+
+    Unlike asyncio.run, the loop outlives the call, so aiohttp sessions and
+    AsyncOpenAI clients bound to it keep their connection pools between calls.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result(timeout)
+
+
+def spawn(coro: Awaitable) -> concurrent.futures.Future:
+    """Schedules a coroutine on the background loop without waiting for it."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
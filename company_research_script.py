@@ -1,14 +1,50 @@
 import asyncio
 import aiohttp
-from typing import Dict
+from typing import Dict, Optional
 import os
 from dotenv import load_dotenv
 
 class CompanyResearcher:
-    def __init__(self):
+    def __init__(self, limit: int = 200, limit_per_host: int = 50, ttl_dns_cache: int = 300,
+                 keepalive_timeout: float = 30, total_timeout: float = 30, trust_env: bool = True):
         load_dotenv()
         self.rapidapi_key = os.getenv("RAPIDAPI_KEY")
         self.api_host = "real-time-glassdoor-data.p.rapidapi.com"
+        # Connection pool settings for the shared session
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.total_timeout = total_timeout
+        self.trust_env = trust_env
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared HTTP session, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        # A session is bound to the loop it was created on, so rebuild it if
+        # the caller is running on a different one (e.g. a new asyncio.run).
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.total_timeout),
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=self.ttl_dns_cache,
+                    keepalive_timeout=self.keepalive_timeout
+                ),
+                trust_env=self.trust_env
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def aclose(self):
+        """Closes the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
 
     async def research_company(self, company_name: str) -> Dict:
         url = f"https://{self.api_host}/company/search"
@@ -19,16 +55,16 @@ class CompanyResearcher:
         params = {"query": company_name}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, params=params) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    # Assuming the first result is the most relevant
-                    if data and data.get('data') and len(data['data']) > 0:
-                        company_id = data['data'][0]['id']
-                        return await self._get_company_details(session, company_id)
-                    else:
-                        return {"error": "Company not found"}
+            session = await self.get_session()
+            async with session.get(url, headers=headers, params=params) as response:
+                response.raise_for_status()
+                data = await response.json()
+                # Assuming the first result is the most relevant
+                if data and data.get('data') and len(data['data']) > 0:
+                    company_id = data['data'][0]['id']
+                    return await self._get_company_details(session, company_id)
+                else:
+                    return {"error": "Company not found"}
         except Exception as e:
             print(f"Error researching company {company_name}: {str(e)}")
             return {"error": "Unable to gather company information"}
@@ -77,6 +113,7 @@ async def main():
     except Exception as e:
         print(f"\nAn error occurred: {str(e)}")
     finally:
+        await researcher.aclose()
         # Get only the tasks that aren't the current task
         current_task = asyncio.current_task()
         tasks = [task for task in asyncio.all_tasks() 
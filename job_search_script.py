@@ -1,18 +1,95 @@
 import os
+import functools
+import hashlib
+import heapq
+import json
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import List, Dict
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from llm_cache import ResponseCache
+
+try:
+    import ahocorasick  # pyahocorasick, optional: speeds up skill matching
+except ImportError:
+    ahocorasick = None
+
+# Only the fields read by _normalize_job_data, so the API returns a smaller payload
+JOB_FIELDS = [
+    "job_title",
+    "employer_name",
+    "job_city",
+    "job_state",
+    "job_description",
+    "job_apply_link",
+    "job_min_salary",
+    "job_max_salary"
+]
+
+# Upper bound on connections kept per host, and so on concurrent page fetches
+POOL_MAXSIZE = 20
+# Each page is a separate request against the API quota
+MAX_PAGES = 5
+
+SEARCH_CACHE_TTL = 60 * 60  # 1 hour, postings change faster than company info
+
+@functools.lru_cache(maxsize=32)
+def _build_skill_automaton(skills: frozenset):
+    """Build an Aho-Corasick automaton over lowercased skills, once per distinct skill set"""
+    automaton = ahocorasick.Automaton()
+    for skill in skills:
+        automaton.add_word(skill, skill)
+    automaton.make_automaton()
+    return automaton
 
 class JobSearcher:
     def __init__(self):
         load_dotenv()
         self.api_key = os.getenv("JSEARCH_API_KEY")
         self.api_url = "https://jsearch.p.rapidapi.com/search"
+        self.timeout = (3.05, 10)  # (connect, read) seconds
+
+        # One pooled session keeps the TLS connection alive between searches
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # Page fetches share one pool of threads instead of starting a new one per search
+        self._executor = ThreadPoolExecutor(max_workers=POOL_MAXSIZE, thread_name_prefix="jsearch")
+
+        # Ranked results for recent (skills, filters) combinations
+        self._cache = ResponseCache(
+            maxsize=128,
+            directory=os.getenv("JOB_SEARCH_CACHE_DIR", ".job_search_cache"),
+            ttl=SEARCH_CACHE_TTL
+        )
+
+    @staticmethod
+    def search_key(resume_data: Dict, filters: Dict) -> str:
+        """
+        Fingerprint of everything that affects a search, used as the cache key.
+        """
+        # Skill order is kept because the query is built from the first five
+        payload = json.dumps({'skills': resume_data.get('skills', []), 'filters': filters}, sort_keys=True)
+        return hashlib.blake2b(payload.encode()).hexdigest()
 
     def search_jobs(self, resume_data: Dict, filters: Dict) -> List[Dict]:
         """
         Search for jobs using the Jsearch API.
         """
+        cache_key = self.search_key(resume_data, filters)
+        cached_jobs = self._cache.get(cache_key)
+        if cached_jobs is not None:
+            print("Loaded search results from cache.")
+            return [dict(job) for job in cached_jobs]
+
         skills = ' '.join(resume_data.get('skills', [])[:5]) # Use top 5 skills for query
         query = f"{skills} in {filters.get('location', 'USA')}"
         print(f"Searching for: {query}") # for debugging
@@ -22,9 +99,14 @@ class JobSearcher:
             "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
         }
         
+        try:
+            num_pages = int(filters.get("num_pages", 1))
+        except (TypeError, ValueError):
+            print(f"Error in job search: invalid number of pages {filters.get('num_pages')!r}")
+            return []
+        num_pages = min(max(num_pages, 1), MAX_PAGES)
         params = {
             "query": query,
-            "page": "1",
             "num_pages": "1",
             "country": "us",
             "language": "en",
@@ -34,25 +116,54 @@ class JobSearcher:
             "job_requirements": "no_experience",
             "radius": "1",
             "exclude_job_publishers": "BeeBe,Dice",
-            "fields": "employer_name,job_publisher,job_title,job_country"
+            "fields": ",".join(JOB_FIELDS)
         }
 
         try:
-            response = requests.get(self.api_url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            jobs = response.json().get('data', [])
+            if num_pages == 1:
+                jobs = self._fetch_page(headers, params, 1)
+            else:
+                # Pages are independent, so fetch them concurrently over the pooled session
+                pages = self._executor.map(lambda page: self._fetch_page(headers, params, page), range(1, num_pages + 1))
+                jobs = [job for page_jobs in pages for job in page_jobs]
             
             # The API returns a rich set of data, here we normalize it
             normalized_jobs = [self._normalize_job_data(job) for job in jobs]
 
-            ranked_jobs = self._score_and_rank_jobs(normalized_jobs, resume_data)
-            return ranked_jobs[:3] # Return top 3 jobs
+            ranked_jobs = self._score_and_rank_jobs(normalized_jobs, resume_data, limit=3) # Return top 3 jobs
+            if ranked_jobs:
+                self._cache.set(cache_key, ranked_jobs)
+            return [dict(job) for job in ranked_jobs]
             
         except requests.exceptions.RequestException as e:
             print(f"Error in job search: {str(e)}")
             return []
 
+    def close(self):
+        """
+        Release the worker threads and pooled connections.
+        """
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+    def warm_up(self):
+        """
+        Open a pooled connection to the Jsearch host ahead of the first search.
+        """
+        try:
+            # Unauthenticated HEAD: only sets up TCP/TLS, does not use quota
+            self._session.head(self.api_url, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            print(f"Error warming up job search connection: {str(e)}")
+
+    def _fetch_page(self, headers: Dict, params: Dict, page: int) -> List[Dict]:
+        """
+        Fetch a single page of raw results from the Jsearch API.
+        """
+        response = self._session.get(self.api_url, headers=headers, params={**params, "page": str(page)}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json().get('data', [])
+
     def _normalize_job_data(self, job: Dict) -> Dict:
         """
         Normalize the job data from Jsearch API to a consistent format.
@@ -60,24 +171,32 @@ class JobSearcher:
         return {
             'title': job.get('job_title'),
             'company_name': job.get('employer_name'),
-            'location': job.get('job_city', 'N/A') + ", " + job.get('job_state', 'N/A'),
+            'location': (job.get('job_city') or 'N/A') + ", " + (job.get('job_state') or 'N/A'),
             'description': job.get('job_description'),
             'url': job.get('job_apply_link'),
             'salary': f"{job.get('job_min_salary')} - {job.get('job_max_salary')}" if job.get('job_min_salary') else "Not specified"
         }
 
-    def _score_and_rank_jobs(self, jobs: List[Dict], resume_data: Dict) -> List[Dict]:
-        """Score and rank jobs based on match with resume"""
-        for job in jobs:
-            score = 0
-            job_desc = job.get('description', '').lower()
-            # Increase score for each matching skill
-            for skill in resume_data.get('skills', []):
-                if skill.lower() in job_desc:
-                    score += 1
-            job['match_score'] = score
+    def _score_and_rank_jobs(self, jobs: List[Dict], resume_data: Dict, limit: int = 3) -> List[Dict]:
+        """Score jobs based on match with resume and return the best `limit`, highest first"""
+        # Lowercase and deduplicate once instead of once per job
+        skills = frozenset(skill.lower() for skill in resume_data.get('skills', []) if skill)
+        if ahocorasick is not None and skills:
+            # One automaton over all skills scans each description in a single pass;
+            # it is reused across searches for the same resume
+            automaton = _build_skill_automaton(skills)
+            for job in jobs:
+                job_desc = (job.get('description') or '').lower()
+                # Increase score for each distinct matching skill
+                job['match_score'] = len({skill for _, skill in automaton.iter(job_desc)})
+        else:
+            for job in jobs:
+                job_desc = (job.get('description') or '').lower()
+                # Increase score for each distinct matching skill
+                job['match_score'] = sum(1 for skill in skills if skill in job_desc)
             
-        return sorted(jobs, key=lambda x: x.get('match_score', 0), reverse=True)
+        # Same order as a stable descending sort, without sorting jobs that are cut anyway
+        return heapq.nlargest(limit, jobs, key=itemgetter('match_score'))
 
 def main():
     # This is a sample execution for testing purposes.
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+try:
+    import diskcache  # optional: shares cached responses across processes and restarts
+except ImportError:
+    diskcache = None
+
+DEFAULT_TTL = 24 * 60 * 60  # 24 hours
+
+
+def make_key(model: str, messages: Any, **params) -> str:
+    """Hashes a request (model, messages and any sampling params) into a stable cache key."""
+    payload = json.dumps({"model": model, "messages": messages, **params}, sort_keys=True)
+    return hashlib.blake2b(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of responses, optionally backed by a diskcache.Cache.
+
+    Entries expire after `ttl` seconds in both layers. When diskcache is not
+    installed or no directory is given, only the in-memory layer is used.
+    """
+
+    def __init__(self, maxsize: int = 2048, directory: Optional[str] = None, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk = diskcache.Cache(directory) if diskcache is not None and directory else None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+        if self._disk is not None:
+            value, expires_at = self._disk.get(key, expire_time=True)
+            if value is not None:
+                # Keep the disk entry's own expiry so a late read does not extend its lifetime
+                self._remember(key, value, expires_at)
+                return value
+        return None
+
+    def set(self, key: str, value: Any):
+        """Stores value under key in memory and, when configured, on disk."""
+        self._remember(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value, expire=self.ttl)
+
+    def _remember(self, key: str, value: Any, expires_at: Optional[float] = None):
+        if expires_at is None:
+            expires_at = time.time() + self.ttl
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
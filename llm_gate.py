@@ -0,0 +1,209 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, Mapping, Optional, Tuple, TypeVar
+
+import openai
+
+_RESET_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_RESET_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+T = TypeVar("T")
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parses OpenAI reset/retry headers such as '20ms', '1.5s' or '6m0s' into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _RESET_PART_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _RESET_UNITS[unit] for amount, unit in parts)
+
+
+class LLMGate:
+    """
+    Adaptive concurrency limit for LLM calls.
+
+    The number of calls allowed in flight follows AIMD: it grows by `increase`
+    after each call that finishes within `target_latency` and is multiplied by
+    `decrease` on a 429, a 5xx, a timeout or a slow call. Rate-limit headers are
+    read after every call so all callers pause before the quota runs out.
+    The gate is thread-safe and may be shared by several event loops.
+
+    Clients used under the gate should be built with max_retries=0 and go
+    through `call`, so every 429 reaches the gate instead of being retried
+    inside the SDK first.
+    """
+
+    def __init__(self, initial_limit: float = 4, max_limit: float = 16, target_latency: float = 10.0,
+                 increase: float = 0.5, decrease: float = 0.5, min_remaining_requests: int = 5):
+        self.limit = float(initial_limit)
+        self.max_limit = float(max_limit)
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.min_remaining_requests = min_remaining_requests
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    async def call(self, request: Callable[[], Awaitable[T]], max_attempts: int = 3,
+                   base_delay: float = 0.5) -> T:
+        """Runs `request()` in a slot, retrying overloads and connection errors with jittered backoff."""
+        for attempt in range(max_attempts):
+            try:
+                async with self.slot():
+                    return await request()
+            except openai.APIStatusError as e:
+                if attempt == max_attempts - 1 or not _is_overload(e):
+                    raise
+            except openai.APIConnectionError:
+                if attempt == max_attempts - 1:
+                    raise
+            # A retry-after from the failed call has already paused the gate; this spreads out the retries
+            await asyncio.sleep(base_delay * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    @asynccontextmanager
+    async def slot(self):
+        """Holds one concurrency slot for the duration of an LLM call."""
+        await self._acquire()
+        start = time.monotonic()
+        try:
+            yield self
+        except openai.APIStatusError as e:
+            if _is_overload(e):
+                self._on_overload(e.response.headers)
+            raise
+        except openai.APITimeoutError:
+            self._on_overload(None)
+            raise
+        else:
+            self._on_success(time.monotonic() - start)
+        finally:
+            self._release()
+
+    def observe_headers(self, headers: Mapping[str, str]):
+        """Pauses new calls when the response says few requests are left in the window."""
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        if remaining is None:
+            return
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            return
+        if remaining < self.min_remaining_requests:
+            delay = _parse_reset(headers.get("retry-after")) or _parse_reset(headers.get("x-ratelimit-reset-requests"))
+            if delay:
+                self._pause(delay)
+
+    async def _acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                delay = self._paused_until - time.monotonic()
+                if delay <= 0 and self._in_flight < max(1, int(self.limit)):
+                    self._in_flight += 1
+                    return
+                waiter = None
+                if delay <= 0:
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+            if waiter is None:
+                await asyncio.sleep(delay)
+            else:
+                await waiter
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_waiters()
+
+    def _on_success(self, latency: float):
+        with self._lock:
+            if latency <= self.target_latency:
+                self.limit = min(self.max_limit, self.limit + self.increase)
+                self._wake_waiters()
+            else:
+                self.limit = max(1.0, self.limit * self.decrease)
+
+    def _on_overload(self, headers: Optional[Mapping[str, str]]):
+        with self._lock:
+            self.limit = max(1.0, self.limit * self.decrease)
+        if headers is not None:
+            delay = _parse_reset(headers.get("retry-after"))
+            if delay:
+                self._pause(delay)
+
+    def _pause(self, delay: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def _wake_waiters(self):
+        # Caller holds the lock. Every waiter re-checks the limit after waking,
+        # which keeps cancelled waiters from swallowing a wake-up.
+        waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            if not waiter.done():
+                loop.call_soon_threadsafe(_resolve, waiter)
+
+
+def _is_overload(error: openai.APIStatusError) -> bool:
+    return error.status_code == 429 or error.status_code >= 500
+
+
+def _resolve(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that paces requests to a tokens-per-minute budget.
+
+    `capacity` tokens may be spent in a burst; the bucket then refills at
+    `refill_per_sec`. Callers block (or await) until their estimated cost fits.
+    """
+
+    def __init__(self, capacity: float = 90_000, refill_per_sec: float = 1_500):
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float):
+        """Blocks until `amount` tokens are available, then spends them."""
+        while True:
+            delay = self._reserve(amount)
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    async def acquire_async(self, amount: float):
+        """Awaits until `amount` tokens are available, then spends them."""
+        while True:
+            delay = self._reserve(amount)
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def _reserve(self, amount: float) -> float:
+        # A request larger than the bucket waits for a full bucket instead of forever
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_sec)
+            self._updated = now
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.refill_per_sec
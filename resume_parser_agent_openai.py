@@ -2,101 +2,426 @@
 
 import os
 import argparse
+import asyncio
+import functools
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import pypdf
-import pickle
 from dotenv import load_dotenv
+from llm_cache import ResponseCache, make_key
+from llm_gate import LLMGate, TokenBucket
+
+try:
+    import pypdfium2 as pdfium  # optional: native PDFium text extraction, much faster than pypdf
+except ImportError:
+    pdfium = None
+
+try:
+    import numba  # optional: fused int8 scoring kernel for large vector stores
+except ImportError:
+    numba = None
 
 load_dotenv()
 
+CHAT_MODEL = "gpt-4o-mini"
+
+# Embedding requests are split so none gets near the API's per-request limits
+EMBEDDING_BATCH_SIZE = 256
+EMBEDDING_BATCH_TOKENS = 250_000
+EMBEDDING_WORKERS = 4
+# 429s on embeddings are retried by the client with exponential backoff and jitter
+EMBEDDING_MAX_RETRIES = 6
+# Chunks per embedding request while indexing streams through the PDF
+PIPELINE_BATCH_SIZE = 64
+# Below this many chunks the BLAS path is faster than calling into the numba kernel
+NUMBA_MIN_CHUNKS = 1024
+SYSTEM_PROMPT = "You are an assistant that answers questions about a resume based on the context provided."
+
+# Shared backpressure for every async chat completion in this process
+llm_gate = LLMGate()
+
+# Paces embedding requests to stay under the tokens-per-minute limit
+embedding_bucket = TokenBucket(capacity=90_000, refill_per_sec=1_500)
+
+# Identical prompts (same resume context and query) are answered from here
+response_cache = ResponseCache(directory=os.getenv("LLM_CACHE_DIR", ".llm_cache"))
+
+_async_client = None
+_async_client_key = None
+
+# PDFium is not thread-safe, even across documents, so every call into it is serialized.
+# Reentrant so a generator finalized by GC while this thread holds it cannot deadlock.
+_pdfium_lock = threading.RLock()
+
 # --- Helper Functions ---
 
-def extract_text_from_pdf(pdf_path):
-    """Extracts text from a PDF file."""
-    print(f"Extracting text from {pdf_path}...")
+def iter_pdf_pages(pdf_path):
+    """Yields the text of each page of a PDF file as soon as it is extracted."""
+    if pdfium is not None:
+        yield from _iter_pdfium_pages(pdf_path)
+        return
     with open(pdf_path, 'rb') as f:
         reader = pypdf.PdfReader(f)
-        text = ""
         for page in reader.pages:
-            text += page.extract_text()
+            # Image-only pages yield no text
+            yield page.extract_text() or ""
+
+def _iter_pdfium_pages(pdf_path):
+    # The lock is released before each yield so a slow consumer never blocks other threads
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(pdf_path)
+        num_pages = len(pdf)
+    try:
+        for index in range(num_pages):
+            with _pdfium_lock:
+                page = pdf[index]
+                try:
+                    textpage = page.get_textpage()
+                    try:
+                        text = textpage.get_text_range()
+                    finally:
+                        textpage.close()
+                finally:
+                    page.close()
+            yield text
+    finally:
+        with _pdfium_lock:
+            pdf.close()
+
+def extract_text_from_pdf(pdf_path):
+    """Extracts text from a PDF file."""
+    print(f"Extracting text from {pdf_path}...")
+    # Join once instead of growing a string per page
+    text = "".join(iter_pdf_pages(pdf_path))
     print("Text extracted successfully.")
     return text
 
 def get_text_chunks(text, chunk_size=1000, overlap=200):
     """Splits text into overlapping chunks."""
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be at least 0 and smaller than chunk_size.")
     print("Splitting text into chunks...")
-    chunks = []
-    for i in range(0, len(text), chunk_size - overlap):
-        chunks.append(text[i:i + chunk_size])
+    step = chunk_size - overlap
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), step)]
     print(f"Created {len(chunks)} chunks.")
     return chunks
 
+def iter_text_chunks(pages, chunk_size=1000, overlap=200):
+    """Streaming get_text_chunks: yields the same chunks, each as soon as its text has arrived."""
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be at least 0 and smaller than chunk_size.")
+    step = chunk_size - overlap
+    buffer = ""
+    for page_text in pages:
+        buffer += page_text
+        # The buffer always starts at a chunk boundary, so a full chunk is final.
+        # Advance an offset and trim once per page; trimming per chunk would copy a long page quadratically.
+        start = 0
+        while len(buffer) - start >= chunk_size:
+            yield buffer[start:start + chunk_size]
+            start += step
+        buffer = buffer[start:]
+    for i in range(0, len(buffer), step):
+        yield buffer[i:i + chunk_size]
+
+def estimate_tokens(text):
+    """Cheap token estimate (about 3 characters per token) used to size embedding batches."""
+    return len(text) // 3 + 1
+
+def batch_texts(texts, max_items=EMBEDDING_BATCH_SIZE, max_tokens=EMBEDDING_BATCH_TOKENS):
+    """Groups texts into consecutive batches that stay under both the item and token caps."""
+    batches = []
+    batch = []
+    batch_tokens = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
 def get_embeddings(texts, client, model="text-embedding-3-small"):
-    """Gets embeddings for a list of texts."""
+    """Gets embeddings for a list of texts, in order, sending batches concurrently."""
     print(f"Generating embeddings for {len(texts)} chunks...")
-    response = client.embeddings.create(input=texts, model=model)
+
+    def embed(batch):
+        embedding_bucket.acquire(sum(estimate_tokens(text) for text in batch))
+        response = client.with_options(max_retries=EMBEDDING_MAX_RETRIES).embeddings.create(input=batch, model=model)
+        return [embedding.embedding for embedding in response.data]
+
+    batches = batch_texts(texts)
+    if len(batches) <= 1:
+        results = [embed(batch) for batch in batches]
+    else:
+        # The OpenAI client is thread-safe; map() keeps results in batch order
+        with ThreadPoolExecutor(max_workers=min(len(batches), EMBEDDING_WORKERS)) as executor:
+            results = list(executor.map(embed, batches))
     print("Embeddings generated.")
-    return [embedding.embedding for embedding in response.data]
+    return [embedding for batch in results for embedding in batch]
 
-def create_or_load_vector_store(resume_file, storage_file="vector_store.pkl", force_reindex=False):
-    """Creates a vector store from a resume or loads it from a file."""
-    if os.path.exists(storage_file) and not force_reindex:
-        print(f"Loading vector store from {storage_file}...")
-        with open(storage_file, 'rb') as f:
-            return pickle.load(f)
-    
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
-    # 1. Extract text
-    resume_text = extract_text_from_pdf(resume_file)
-    
-    # 2. Split into chunks
-    text_chunks = get_text_chunks(resume_text)
+def normalize_vectors(vectors):
+    """L2-normalizes each row so cosine similarity becomes a plain dot product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    # einsum squares and sums each row in one pass, without a temporary vectors**2
+    row_norms = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+    return vectors / (row_norms[:, np.newaxis] + 1e-12)
+
+def quantize_vectors(vectors):
+    """Quantizes each row to int8 with its own max-abs scale; returns (int8 vectors, float32 scales)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / np.float32(127.0)
+    scales[scales == 0] = 1.0
+    quantized = np.round(vectors / scales[:, np.newaxis]).astype(np.int8)
+    return quantized, scales
+
+def quantized_row_norms(vectors, scales):
+    """Returns the L2 norm of each dequantized row (int8 row times its scale) as float32."""
+    # Accumulating the int8 squares in int32 avoids a float copy of the matrix and cannot overflow
+    squares = np.einsum('ij,ij->i', vectors, vectors, dtype=np.int32)
+    return (np.sqrt(squares, dtype=np.float32) * np.asarray(scales, dtype=np.float32)).astype(np.float32)
+
+def build_vector_store(resume_file):
+    """Builds an in-memory vector store from a resume without touching disk."""
+    client = get_client()
     
-    # 3. Get embeddings
-    embeddings = get_embeddings(text_chunks, client)
+    # 1-3. Extract text, split into chunks and get embeddings as a pipeline:
+    # full batches are embedded on worker threads while later pages are parsed
+    print(f"Extracting and embedding {resume_file}...")
+    text_chunks = []
+    batch = []
+    futures = []
+    with ThreadPoolExecutor(max_workers=EMBEDDING_WORKERS) as executor:
+        for chunk in iter_text_chunks(iter_pdf_pages(resume_file)):
+            text_chunks.append(chunk)
+            batch.append(chunk)
+            if len(batch) == PIPELINE_BATCH_SIZE:
+                futures.append(executor.submit(get_embeddings, batch, client))
+                batch = []
+        if batch:
+            futures.append(executor.submit(get_embeddings, batch, client))
+        embeddings = [embedding for future in futures for embedding in future.result()]
+    if not text_chunks:
+        raise ValueError(f"No text could be extracted from {resume_file}.")
+    print(f"Created {len(text_chunks)} chunks.")
     
-    # 4. Create and save vector store
-    vector_store = {
+    # 4. Create vector store with unit-length vectors, stored as int8 plus a scale per row
+    vectors, scales = quantize_vectors(normalize_vectors(embeddings))
+    return {
         "chunks": text_chunks,
-        "vectors": np.array(embeddings)
+        "vectors": vectors,
+        "scales": scales,
+        # Rounding moves rows slightly off unit length; dividing by these keeps scores exact cosines
+        "row_norms": quantized_row_norms(vectors, scales)
     }
+
+def get_chunks_file(storage_file):
+    """Returns the JSON sidecar path that holds the chunks, per-row scales and norms for a vector store file."""
+    return os.path.splitext(storage_file)[0] + ".json"
+
+def load_vector_store(storage_file, chunks_file):
+    """Loads a saved vector store, or returns None if the files are not in the current layout."""
+    print(f"Loading vector store from {storage_file}...")
+    try:
+        # Memory-map the vectors: pages are read on first use instead of at load time
+        vectors = np.load(storage_file, mmap_mode='r')
+    except ValueError:
+        # Pickled stores from before the .npy format are not loaded
+        return None
+    if not isinstance(vectors, np.ndarray):
+        # An .npz archive from before the vectors were stored as a standalone .npy
+        vectors.close()
+        return None
+    try:
+        with open(chunks_file, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    except ValueError:
+        # A corrupt or empty sidecar is rebuilt like any other stale store
+        return None
+    # Only unit-length rows can be scored with a plain dot product
+    if not isinstance(metadata, dict) or "chunks" not in metadata or metadata.get("normalized") is not True:
+        return None
+    scales = metadata.get("scales")
+    if vectors.dtype != np.int8 or vectors.ndim != 2 or scales is None or len(scales) != len(vectors):
+        return None
+    scales = np.asarray(scales, dtype=np.float32)
+    row_norms = metadata.get("row_norms")
+    row_norms = quantized_row_norms(vectors, scales) if row_norms is None else np.asarray(row_norms, dtype=np.float32)
+    return {
+        "chunks": metadata["chunks"],
+        "vectors": vectors,
+        "scales": scales,
+        "row_norms": row_norms
+    }
+
+def _replace_file(path, mode, write, **open_kwargs):
+    """Writes a file through a temporary sibling and renames it into place."""
+    # Readers that memory-mapped the old file keep its inode instead of seeing it truncated
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def create_or_load_vector_store(resume_file, storage_file="vector_store.npy", force_reindex=False):
+    """Creates a vector store from a resume or loads it from a file."""
+    chunks_file = get_chunks_file(storage_file)
+    if os.path.exists(storage_file) and os.path.exists(chunks_file) and not force_reindex:
+        vector_store = load_vector_store(storage_file, chunks_file)
+        if vector_store is not None:
+            return vector_store
+        print(f"{storage_file} is outdated or unreadable; rebuilding it.")
+    
+    vector_store = build_vector_store(resume_file)
     
     print(f"Saving vector store to {storage_file}...")
-    with open(storage_file, 'wb') as f:
-        pickle.dump(vector_store, f)
+    metadata = {
+        "chunks": vector_store["chunks"],
+        "scales": vector_store["scales"].tolist(),
+        "row_norms": vector_store["row_norms"].tolist(),
+        "normalized": True
+    }
+    # A file object stops np.save from appending its own .npy suffix
+    _replace_file(storage_file, 'wb', lambda f: np.save(f, vector_store["vectors"]))
+    _replace_file(chunks_file, 'w', lambda f: json.dump(metadata, f), encoding='utf-8')
     print("Vector store saved.")
         
     return vector_store
 
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _score_int8_rows(vectors, query_vector, row_weights):
+        # Multiplies the int8 rows by the query without materializing a float32 copy of the matrix
+        num_rows, dims = vectors.shape
+        scores = np.empty(num_rows, dtype=np.float32)
+        for i in numba.prange(num_rows):
+            total = np.float32(0.0)
+            for j in range(dims):
+                total += np.float32(vectors[i, j]) * query_vector[j]
+            scores[i] = total * row_weights[i]
+        return scores
+else:
+    _score_int8_rows = None
+
 def find_similar_chunks(query_embedding, vector_store, top_k=5):
     """Finds the most similar chunks to a query embedding."""
     print("Finding similar chunks...")
-    query_vector = np.array(query_embedding)
-    similarities = np.dot(vector_store["vectors"], query_vector) / (np.linalg.norm(vector_store["vectors"], axis=1) * np.linalg.norm(query_vector))
+    # A float32 query keeps the product in single precision (sgemv); a float64 one would upcast the matrix
+    query_vector = np.asarray(query_embedding, dtype=np.float32)
+    query_vector = query_vector / (np.sqrt(np.vdot(query_vector, query_vector)) + 1e-12)
+    vectors = vector_store["vectors"]
+    scales = vector_store.get("scales")
+    row_norms = vector_store.get("row_norms")
+    if (_score_int8_rows is not None and vectors.dtype == np.int8 and len(vectors) >= NUMBA_MIN_CHUNKS
+            and scales is not None and row_norms is not None):
+        # np.asarray drops the memmap subclass without copying the data
+        similarities = _score_int8_rows(np.asarray(vectors), query_vector, scales / (row_norms + 1e-12))
+    else:
+        # Stored vectors are unit length, so cosine similarity is a single matrix-vector product
+        similarities = vectors @ query_vector
+        # Undo the per-row int8 quantization scale, then divide by the cached row norms
+        if scales is not None:
+            similarities *= scales
+        if row_norms is not None:
+            similarities /= row_norms + 1e-12
     
-    top_indices = np.argsort(similarities)[-top_k:][::-1]
+    # Partition out the top k in O(N), then sort only those k
+    top_k = min(top_k, len(similarities))
+    if top_k < len(similarities):
+        top_indices = np.argpartition(similarities, -top_k)[-top_k:]
+    else:
+        top_indices = np.arange(len(similarities))
+    top_indices = top_indices[np.argsort(-similarities[top_indices])]
     print(f"Found {len(top_indices)} relevant chunks.")
     return [vector_store["chunks"][i] for i in top_indices]
 
-def answer_query(query, resume_file, force_reindex=False):
-    """Answers a query about a resume using a RAG approach."""
+def find_similar_chunks_batch(query_embeddings, vector_store, top_k=5):
+    """Finds the most similar chunks for each of several query embeddings; returns one list per query."""
+    print("Finding similar chunks...")
+    query_matrix = np.asarray(query_embeddings, dtype=np.float32)
+    query_matrix = query_matrix / (np.sqrt(np.einsum('ij,ij->i', query_matrix, query_matrix))[:, np.newaxis] + 1e-12)
+    # One (N, d) x (d, Q) product reads the stored matrix once for all queries, instead of once per query
+    similarities = vector_store["vectors"] @ query_matrix.T
+    scales = vector_store.get("scales")
+    if scales is not None:
+        similarities *= scales[:, np.newaxis]
+    row_norms = vector_store.get("row_norms")
+    if row_norms is not None:
+        similarities /= row_norms[:, np.newaxis] + 1e-12
+    similarities = similarities.T
     
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # Partition out the top k of every query's row, then sort only those k
+    num_chunks = similarities.shape[1]
+    top_k = min(top_k, num_chunks)
+    if top_k < num_chunks:
+        top_indices = np.argpartition(similarities, -top_k, axis=1)[:, -top_k:]
+    else:
+        top_indices = np.broadcast_to(np.arange(num_chunks), similarities.shape)
+    order = np.argsort(-np.take_along_axis(similarities, top_indices, axis=1), axis=1)
+    top_indices = np.take_along_axis(top_indices, order, axis=1)
+    print(f"Found {top_indices.size} relevant chunks for {len(top_indices)} queries.")
+    return [[vector_store["chunks"][i] for i in row] for row in top_indices]
 
-    # 1. Create or load vector store
-    vector_store = create_or_load_vector_store(resume_file, force_reindex=force_reindex)
-    
-    # 2. Get query embedding
-    query_embedding = get_embeddings([query], client)[0]
-    
-    # 3. Find similar chunks
-    relevant_chunks = find_similar_chunks(query_embedding, vector_store)
-    
-    # 4. Build the prompt
+@functools.lru_cache(maxsize=4)
+def _get_openai_client(api_key):
+    """Builds one OpenAI client per API key."""
+    return OpenAI(api_key=api_key, max_retries=2, timeout=30.0)
+
+def get_client():
+    """Returns the shared OpenAI client so calls reuse one connection pool."""
+    return _get_openai_client(os.getenv("OPENAI_API_KEY"))
+
+def get_async_client():
+    """Returns the shared AsyncOpenAI client for the running event loop."""
+    global _async_client, _async_client_key
+    # The client's connection pool is bound to the loop it was first used on.
+    key = (asyncio.get_running_loop(), os.getenv("OPENAI_API_KEY"))
+    if _async_client is None or _async_client_key != key:
+        _async_client = AsyncOpenAI(api_key=key[1], max_retries=2, timeout=30.0)
+        _async_client_key = key
+    return _async_client
+
+async def gated_chat_completion(client, **params):
+    """Runs one chat completion under llm_gate, which (not the SDK) backs off and retries overloads."""
+    # SDK retries would hide each 429 from the gate until every retry had failed
+    client = client.with_options(max_retries=0)
+
+    async def request():
+        raw_response = await client.chat.completions.with_raw_response.create(**params)
+        llm_gate.observe_headers(raw_response.headers)
+        return raw_response.parse()
+
+    return await llm_gate.call(request)
+
+def warm_up():
+    """Opens the OpenAI connection ahead of the first real request."""
+    try:
+        get_client().models.list()
+    except Exception as e:
+        print(f"OpenAI warm-up failed: {str(e)}")
+
+async def warm_up_async():
+    """Opens the async client's OpenAI connection ahead of the first real request."""
+    try:
+        await get_async_client().models.list()
+    except Exception as e:
+        print(f"OpenAI warm-up failed: {str(e)}")
+
+def build_prompt(query, relevant_chunks):
+    """Builds the RAG prompt from the retrieved resume chunks."""
     context = "\n\n---\n\n".join(relevant_chunks)
-    prompt = f"""
+    return f"""
     You are a helpful assistant. Answer the following query based on the provided resume context. 
     
     **Resume Context:**
@@ -107,18 +432,197 @@ def answer_query(query, resume_file, force_reindex=False):
     
     **Answer:**
     """
+
+def build_multi_prompt(queries, relevant_chunks):
+    """Builds one RAG prompt that asks for a JSON object answering every query."""
+    context = "\n\n---\n\n".join(relevant_chunks)
+    keys = ", ".join(queries)
+    query_lines = "\n    ".join(f"- {key}: {query}" for key, query in queries.items())
+    return f"""
+    You are a helpful assistant. Answer each of the following queries based on the provided resume context.
+    Respond with a JSON object with exactly these keys: {keys}. The value for each key is the answer to the query with that key.
+    
+    **Resume Context:**
+    {context}
     
-    # 5. Get answer from OpenAI
-    print("Getting answer from OpenAI...")
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are an assistant that answers questions about a resume based on the context provided."},
-            {"role": "user", "content": prompt}
-        ]
+    **Queries:**
+    {query_lines}
+    """
+
+def merge_chunks(chunk_lists):
+    """Merges retrieved chunks for several queries, dropping duplicates but keeping rank order."""
+    return list(dict.fromkeys(chunk for chunks in chunk_lists for chunk in chunks))
+
+def parse_multi_answer(content, queries):
+    """Parses the JSON answer to a multi-query prompt, or returns None if it is not a JSON object."""
+    try:
+        answers = json.loads(content)
+    except (TypeError, json.JSONDecodeError):
+        answers = None
+    if not isinstance(answers, dict):
+        print("Could not parse the JSON answer.")
+        return None
+    return {key: answers.get(key, "") for key in queries}
+
+def sampling_params(max_tokens=None, temperature=None):
+    """Returns the completion params that were set; unset ones keep the API defaults (no output cap)."""
+    params = {}
+    if max_tokens is not None:
+        params["max_tokens"] = max_tokens
+    if temperature is not None:
+        params["temperature"] = temperature
+    return params
+
+def _chat_messages(prompt):
+    """Wraps a RAG prompt in the system and user messages sent to the chat model."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def _chat_request(prompt, max_tokens=None, temperature=None, json_mode=False):
+    """Returns the response cache key and the chat completion params for a prompt."""
+    messages = _chat_messages(prompt)
+    params = sampling_params(max_tokens, temperature)
+    if json_mode:
+        cache_key = make_key(CHAT_MODEL, messages, **params, response_format="json_object")
+        params["response_format"] = {"type": "json_object"}
+    else:
+        cache_key = make_key(CHAT_MODEL, messages, **params)
+    return cache_key, {"model": CHAT_MODEL, "messages": messages, **params}
+
+def _cache_lookup(cache_key):
+    """Returns the answer to a prompt that was answered before, or None."""
+    answer = response_cache.get(cache_key)
+    if answer is not None:
+        print("Answer loaded from cache.")
+    return answer
+
+def _validate_multi_answer(response, queries, max_tokens):
+    """Returns the parsed answers of a multi-query completion, raising ValueError if it is unusable."""
+    # Raise instead of returning empty answers, so callers that memoize results retry next time
+    if response.choices[0].finish_reason == "length":
+        raise ValueError(f"The JSON answer was cut off at max_tokens={max_tokens}.")
+    answers = parse_multi_answer(response.choices[0].message.content, queries)
+    if answers is None:
+        raise ValueError("The model did not return a JSON object.")
+    return answers
+
+def _multi_prompt(queries, query_embeddings, vector_store):
+    """Retrieves chunks for every query in one batch and builds the combined JSON prompt."""
+    relevant_chunks = merge_chunks(find_similar_chunks_batch(query_embeddings, vector_store))
+    return build_multi_prompt(queries, relevant_chunks)
+
+async def _load_vector_store_async(resume_file, force_reindex):
+    """Runs create_or_load_vector_store off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, functools.partial(create_or_load_vector_store, resume_file, force_reindex=force_reindex)
     )
-    print("Answer received.")
-    return response.choices[0].message.content
+
+async def _embed_queries_async(client, queries):
+    """Embeds a few query strings in one request on the async client."""
+    await embedding_bucket.acquire_async(sum(estimate_tokens(query) for query in queries))
+    response = await client.with_options(max_retries=EMBEDDING_MAX_RETRIES).embeddings.create(
+        input=queries, model="text-embedding-3-small"
+    )
+    return [embedding.embedding for embedding in response.data]
+
+def answer_query(query, resume_file=None, force_reindex=False, vector_store=None,
+                 max_tokens=None, temperature=None):
+    """Answers a query about a resume using a RAG approach."""
+    
+    client = get_client()
+
+    # 1. Create or load vector store, unless the caller already has one
+    if vector_store is None:
+        vector_store = create_or_load_vector_store(resume_file, force_reindex=force_reindex)
+    
+    # 2. Get query embedding
+    query_embedding = get_embeddings([query], client)[0]
+    
+    # 3-4. Find similar chunks and build the prompt
+    prompt = build_prompt(query, find_similar_chunks(query_embedding, vector_store))
+    
+    # 5. Get answer from OpenAI, unless this exact prompt was answered before
+    cache_key, request = _chat_request(prompt, max_tokens, temperature)
+    answer = _cache_lookup(cache_key)
+    if answer is None:
+        print("Getting answer from OpenAI...")
+        response = client.chat.completions.create(**request)
+        print("Answer received.")
+        answer = response.choices[0].message.content
+        response_cache.set(cache_key, answer)
+    return answer
+
+async def answer_query_async(query, resume_file=None, force_reindex=False, vector_store=None,
+                             max_tokens=None, temperature=None):
+    """Async variant of answer_query so several queries can run concurrently."""
+    
+    client = get_async_client()
+
+    if vector_store is None:
+        vector_store = await _load_vector_store_async(resume_file, force_reindex)
+    query_embedding = (await _embed_queries_async(client, [query]))[0]
+    prompt = build_prompt(query, find_similar_chunks(query_embedding, vector_store))
+    
+    cache_key, request = _chat_request(prompt, max_tokens, temperature)
+    answer = _cache_lookup(cache_key)
+    if answer is None:
+        print("Getting answer from OpenAI...")
+        response = await gated_chat_completion(client, **request)
+        print("Answer received.")
+        answer = response.choices[0].message.content
+        response_cache.set(cache_key, answer)
+    return answer
+
+def answer_query_multi(queries, resume_file=None, force_reindex=False, vector_store=None,
+                       max_tokens=None, temperature=None):
+    """Answers several named queries with one retrieval pass and one JSON-mode completion."""
+    
+    client = get_client()
+
+    # 1. Create or load vector store, unless the caller already has one
+    if vector_store is None:
+        vector_store = create_or_load_vector_store(resume_file, force_reindex=force_reindex)
+    
+    # 2. Get all query embeddings in one request
+    query_embeddings = get_embeddings(list(queries.values()), client)
+    
+    # 3-4. Find similar chunks for every query in one batch and build the prompt
+    prompt = _multi_prompt(queries, query_embeddings, vector_store)
+    
+    # 5. Get answers from OpenAI, unless this exact prompt was answered before
+    cache_key, request = _chat_request(prompt, max_tokens, temperature, json_mode=True)
+    answers = _cache_lookup(cache_key)
+    if answers is None:
+        print("Getting answers from OpenAI...")
+        response = client.chat.completions.create(**request)
+        print("Answers received.")
+        answers = _validate_multi_answer(response, queries, max_tokens)
+        response_cache.set(cache_key, answers)
+    return answers
+
+async def answer_query_multi_async(queries, resume_file=None, force_reindex=False, vector_store=None,
+                                   max_tokens=None, temperature=None):
+    """Async variant of answer_query_multi."""
+    
+    client = get_async_client()
+
+    if vector_store is None:
+        vector_store = await _load_vector_store_async(resume_file, force_reindex)
+    query_embeddings = await _embed_queries_async(client, list(queries.values()))
+    prompt = _multi_prompt(queries, query_embeddings, vector_store)
+    
+    cache_key, request = _chat_request(prompt, max_tokens, temperature, json_mode=True)
+    answers = _cache_lookup(cache_key)
+    if answers is None:
+        print("Getting answers from OpenAI...")
+        response = await gated_chat_completion(client, **request)
+        print("Answers received.")
+        answers = _validate_multi_answer(response, queries, max_tokens)
+        response_cache.set(cache_key, answers)
+    return answers
 
 
 # --- Main Execution ---